@@ -1,24 +1,30 @@
 #!/usr/bin/env Python3
 
-import sys
 import time
 import warnings
 import math
-import multiprocessing
-import functools
 
 import matplotlib.pyplot as plt
 import matplotlib.ticker
 import matplotlib
-# For Greg's system
-matplotlib.use("TkAgg")
+# For Greg's system. Headless machines (and the tests) fall back to matplotlib's default backend.
+try:
+    matplotlib.use("TkAgg")
+except ImportError:
+    pass
 
 import numpy as np
-import scipy.optimize
 
 
 from GLTaxTools import *
 from GLLoanTools import *
+from GLKernels import *
+
+
+FIELD_IDX = {result: index for index, result in enumerate(RESULT_KEYS)}
+# simmany's master_results array holds these summaries in its first rows, followed by one row per simkey
+SUMMARY_KEYS = ['Median', 'Mean', 'STDEV', '10%', '90%']
+SUMMARY_IDX = {summary: index for index, summary in enumerate(SUMMARY_KEYS)}
 
 
 class Parameters:
@@ -29,17 +35,22 @@ class Parameters:
         self.max_apr=1.25
 
 
+PARAMS = Parameters()
+
+
 class FinancialEvent(object):    
     def __init__(self):
         self.name = 'Unnamed'
         self.definedas = 'NeverDefined'
-        self.cashflow = {}
-        self.nwflow = {}
+        self.cashflow = np.zeros(PARAMS.max_years)
+        self.nwflow = np.zeros(PARAMS.max_years)
         self.agi_impacting = False
         
     def define_single(self, amount, name, year, agi_impacting=None, nw_amount=0):
         self.name = name
         self.definedas = 'single'
+        if year < 0 or year >= PARAMS.max_years:
+            raise ValueError
         self.cashflow[year] = amount
         self.nwflow[year] = nw_amount
         if agi_impacting is None:
@@ -49,7 +60,7 @@ class FinancialEvent(object):
             self.agi_impacting = agi_impacting
         return self
         
-    def define_yearly(self, yearly_amount, name, yearly_nw_amount=0, year_start=0, year_end=Parameters().max_years, agi_impacting=None, apr=1.0, definedas='yearly'):
+    def define_yearly(self, yearly_amount, name, yearly_nw_amount=0, year_start=0, year_end=PARAMS.max_years, agi_impacting=None, apr=1.0, definedas='yearly'):
         self.name = name
         self.definedas = definedas
         if agi_impacting is None:
@@ -57,27 +68,30 @@ class FinancialEvent(object):
             agi_impacting = True if yearly_amount >= 0 else False
         else:
             self.agi_impacting = agi_impacting
-        if year_start > year_end or year_end > Parameters().max_years:
+        if year_start < 0 or year_start > year_end or year_end > PARAMS.max_years:
             raise ValueError
-        for year in np.arange(year_start, year_end):
-            self.cashflow[year] = yearly_amount * (apr ** (year-year_start))
-            self.nwflow[year] = yearly_nw_amount * (apr ** (year-year_start))
+        growth = np.power(apr, np.arange(year_end - year_start))
+        self.cashflow[year_start:year_end] = yearly_amount * growth
+        self.nwflow[year_start:year_end] = yearly_nw_amount * growth
         return self
     
-    def define_monthly(self, monthly_amount, name, monthly_nw_amount=0, year_start=0, year_end=Parameters().max_years, agi_impacting=None, apr=1.0):
+    def define_monthly(self, monthly_amount, name, monthly_nw_amount=0, year_start=0, year_end=PARAMS.max_years, agi_impacting=None, apr=1.0):
         self.define_yearly(yearly_amount = monthly_amount * 12, name=name, yearly_nw_amount = monthly_nw_amount * 12, year_start=year_start, year_end=year_end, agi_impacting=agi_impacting, apr=apr, definedas='monthly')
         return self
         
-    def define_loan(self, loan_value, name, duration, year_start=0, agi_impacting=None, apr=Parameters().default_apr, early_payoff_year=Parameters().max_years):
+    def define_loan(self, loan_value, name, duration, year_start=0, agi_impacting=None, apr=PARAMS.default_apr, early_payoff_year=PARAMS.max_years):
         self.name = name
         self.definedas = 'loan'
         self.agi_impacting = False if agi_impacting is None else agi_impacting
-        if year_start+duration > Parameters().max_years or duration < 0 or Parameters().min_apr > apr > Parameters().max_apr:
-            raise ValueError
+        # The schedule below is duration-1 regular payments plus a final closing payment, so it needs at least two years
+        if year_start < 0 or year_start+duration > PARAMS.max_years or duration < 2 or not PARAMS.min_apr <= apr <= PARAMS.max_apr:
+            raise ValueError(f'loan must last at least 2 years, within {PARAMS.max_years} years, at an apr between {PARAMS.min_apr} and {PARAMS.max_apr}')
         yearly_payment = find_yearly_payment(loan_value, apr, duration)
         payoff_year = min(year_start+duration, early_payoff_year)
-        for year in np.arange(year_start, payoff_year):
-            self.cashflow[year] = int(-yearly_payment)
+        if payoff_year <= year_start:
+            raise ValueError('early_payoff_year must come after year_start')
+        year = payoff_year - 1
+        self.cashflow[year_start:payoff_year] = int(-yearly_payment)
         principal_remaining = int(pay_yearly_on_loan(loan_value, apr, year-year_start, yearly_payment))
         # I believe there's a fencepost error here - early testing showed that the final year had payments of _nearly_ 2X a normal
         # year to close the account without an 'extra' year
@@ -85,18 +99,18 @@ class FinancialEvent(object):
         return self
     
     def gross_income(self, year):
-        return self.cashflow.get(year, 0)
+        return self.cashflow[year]
         
     def adjusted_gross_income(self, year):
         return self.gross_income(year) if self.agi_impacting else 0
 
     def explicit_nw_impact(self, year):
-        return self.nwflow.get(year,0)
+        return self.nwflow[year]
     
     def scatterdata(self, year_start=0, year_end=None):
-        xvalues = [k for k in self.cashflow]
-        yvalues = [self.gross_income(year) for year in xvalues]
-        average = np.average(yvalues)
+        xvalues = np.flatnonzero(self.cashflow[year_start:year_end]) + year_start
+        yvalues = self.cashflow[xvalues]
+        average = yvalues.mean() if yvalues.size else 0
         return xvalues, yvalues, self.name + f' ({int(average)} avg)'
 
 
@@ -107,93 +121,129 @@ class FinancialModel:
         self.nw_apr = nw_apr
         self.nw_apr_stdev = nw_apr_stdev
         self.fevents = []
-        self.residences = {} # Dict keyed by simyearhash with simkey None
+        self._tax_cache = {} # TaxTable for each (status, residence) the model has used
+        self._invalidate_sim_arrays()
+        self.residences = [None] * PARAMS.max_years # Location for each year
         if location is not None:
             self.change_residence(location, year_start=0)
-        self.status = {}
+        self.status = [None] * PARAMS.max_years # Filing status for each year
         self.change_status(status, year_start=0)
         self.initial_nw = initial_nw
 
+    @staticmethod
+    def _year_span(year_start, year_end):
+        # Whole-year [start, end) range for the per-year lists, clamped to the simulated years like the original
+        # year-by-year fill (which just skipped negative years)
+        year_start = 0 if year_start is None else year_start
+        year_end = PARAMS.max_years if year_end is None else max(year_start+1, year_end)
+        if year_start != int(year_start) or year_end != int(year_end):
+            raise ValueError('years must be whole numbers')
+        fill_start = max(0, int(year_start))
+        return fill_start, max(fill_start, min(int(year_end), PARAMS.max_years))
+
     def change_residence(self, location, year_start=None, year_end=None):
-        if year_start is None:
-            year_start = 0
-        if year_end is None:
-            fill_end = Parameters().max_years
-        else:
-            fill_end = max(year_start+1, year_end)
-        for year in np.arange(year_start, fill_end):
-            self.residences[year] = location
+        fill_start, fill_end = self._year_span(year_start, year_end)
+        self.residences[fill_start:fill_end] = [location] * (fill_end - fill_start)
+        self._invalidate_sim_arrays()
 
     def change_status(self, status, year_start=None, year_end=None):
-        if year_start is None:
-            year_start = 0
-        if year_end is None:
-            fill_end = Parameters().max_years
-        else:
-            fill_end = max(year_start+1, year_end)
-        for year in np.arange(year_start, fill_end):
-            self.status[year] = status
+        fill_start, fill_end = self._year_span(year_start, year_end)
+        self.status[fill_start:fill_end] = [status] * (fill_end - fill_start)
+        self._invalidate_sim_arrays()
         
     def add_single(self, *args, **kwargs):
-        fe = FinancialEvent().define_single(*args, **kwargs)
-        self.fevents.append(fe)
+        self.add_fevent(FinancialEvent().define_single(*args, **kwargs))
     
     def add_monthly(self, *args, **kwargs):
-        fe = FinancialEvent().define_monthly(*args, **kwargs)
-        self.fevents.append(fe)
+        self.add_fevent(FinancialEvent().define_monthly(*args, **kwargs))
         
     def add_yearly(self, *args, **kwargs):
-        fe = FinancialEvent().define_yearly(*args, **kwargs)
-        self.fevents.append(fe)
+        self.add_fevent(FinancialEvent().define_yearly(*args, **kwargs))
     
     def add_loan(self, *args, **kwargs):
-        fe = FinancialEvent().define_loan(*args, **kwargs)
-        self.fevents.append(fe)
+        self.add_fevent(FinancialEvent().define_loan(*args, **kwargs))
         
     def add_fevent(self, fevent):
         self.fevents.append(fevent)
+        self._invalidate_sim_arrays()
         
     def add_fevents(self, fevents):
         self.fevents.extend(fevents)
+        self._invalidate_sim_arrays()
+
+    def _invalidate_sim_arrays(self):
+        self._cashmat = None # (n_events, max_years) stacks of the fevents, built lazily by _finalize
+        self._gross_year = None # (max_years,) totals across fevents, built lazily by _prepare_sim_arrays
+
+    def _sim_arrays_key(self):
+        # Cheap signature of what the cached arrays were built from, so fevents/status/residences edited directly
+        # (rather than through add_*/change_*) still rebuild them. Holding the events themselves keeps their
+        # identities from being reused. An event's own arrays edited in place after it was added are not detected.
+        return tuple(self.fevents), tuple(self.status), tuple(self.residences)
+
+    def _finalize(self):
+        # Stack every event into (n_events, max_years) cashflow/nwflow matrices and an AGI mask, once per change to fevents
+        if self._cashmat is None or self._cashmat_key != tuple(self.fevents):
+            self._cashmat_key = tuple(self.fevents)
+            self._cashmat = np.array([fe.cashflow for fe in self.fevents]).reshape(-1, PARAMS.max_years)
+            self._nwmat = np.array([fe.nwflow for fe in self.fevents]).reshape(-1, PARAMS.max_years)
+            self._agi_mask = np.array([1.0 if fe.agi_impacting else 0.0 for fe in self.fevents])
+
+    def get_taxtable(self, status, residence):
+        key = (status, residence)
+        if key not in self._tax_cache:
+            self._tax_cache[key] = TaxTable(status=status, state=residence)
+        return self._tax_cache[key]
+
+    def _prepare_sim_arrays(self):
+        # Yearly totals across every event, plus the tax owed on them. None of these depend on the
+        # Monte Carlo draws, so they are computed once rather than per event per year per run.
+        if self._gross_year is None or self._gross_year_key != self._sim_arrays_key():
+            self._gross_year_key = self._sim_arrays_key()
+            self._finalize()
+            self._gross_year = np.clip(self._cashmat, 0, None).sum(axis=0)
+            self._agi_year = np.clip(self._cashmat * self._agi_mask[:, None], 0, None).sum(axis=0)
+            self._exp_year = np.abs(np.clip(self._cashmat, None, 0).sum(axis=0))
+            self._nwimp_year = self._nwmat.sum(axis=0)
+            # Status and residence only change a handful of times, so tax each run of years sharing them in one go
+            self._tax_year = np.zeros(PARAMS.max_years)
+            bucket_start = 0
+            for year in range(1, PARAMS.max_years + 1):
+                if year < PARAMS.max_years and (self.status[year], self.residences[year]) == (self.status[bucket_start], self.residences[bucket_start]):
+                    continue
+                taxes = self.get_taxtable(self.status[bucket_start], self.residences[bucket_start])
+                self._tax_year[bucket_start:year] = taxes.incometax(self._agi_year[bucket_start:year])
+                bucket_start = year
 
     def add_status_to_plot(self, ax, fontsize=9):
-        xvalues = []
-        yvalues = [None] # Initialize with a single entry
-        text = []
-        for sy in sorted(self.status.keys()):
-            if yvalues[-1] is not self.status[sy]:
-                yvalues.append(self.status[sy])
-                xvalues.append(sy)
-                text.append(self.status[sy])
-        yvalues = yvalues[1:]
-        for x,y,t in zip(xvalues, yvalues, text):  
-            ax.annotate(t, xy=(x,0), xytext=(5,5), textcoords='offset points', arrowprops={'arrowstyle':'-'})
+        # Annotate the first year of each run of identical statuses
+        previous = None
+        for year, status in enumerate(self.status):
+            if status != previous:
+                ax.annotate(status, xy=(year,0), xytext=(5,5), textcoords='offset points', arrowprops={'arrowstyle':'-'})
+            previous = status
             
     def add_residence_to_plot(self, ax, fontsize=9):
-        xvalues = []
-        yvalues = [None] # Initialize with a single entry
-        text = []
-        for sy in sorted(self.residences.keys()):
-            if yvalues[-1] is not self.residences[sy]:
-                yvalues.append(self.residences[sy])
-                xvalues.append(sy)
-                text.append(self.residences[sy])
-        yvalues = yvalues[1:]
-        for x,y,t in zip(xvalues, yvalues, text):  
-            ax.annotate(t, xy=(x,0), xytext=(5,-5), textcoords='offset points', arrowprops={'arrowstyle':'-'})
+        # Annotate the first year of each run of identical residences
+        previous = None
+        for year, residence in enumerate(self.residences):
+            if residence != previous:
+                ax.annotate(residence, xy=(year,0), xytext=(5,-5), textcoords='offset points', arrowprops={'arrowstyle':'-'})
+            previous = residence
             
     def plot_cashflow(self, year_start=0, year_end=25, block=False):
         fig, axs = plt.subplots(1,2,figsize=(15,5), constrained_layout=True, sharex=True)
+        xlabel = 'Years Since Initial Conditions' if self.real_year == 0 else 'Year'
         ax = axs.flat[0]
         years=np.arange(year_start, year_end)
-        max_y = np.max([np.max([fe.gross_income(year) for year in years]) for fe in self.fevents])
-        min_y = np.min([np.min([fe.gross_income(year) for year in years]) for fe in self.fevents])
+        self._finalize()
+        max_y = self._cashmat[:, years].max()
+        min_y = self._cashmat[:, years].min()
         ax.set_xlim(left=self.real_year+year_start, right=self.real_year+year_end)
         ax.xaxis.set_major_locator(matplotlib.ticker.MaxNLocator(integer=True))
         for fe in self.fevents:
             xvalues, yvalues, label = fe.scatterdata(year_start, year_end)
-            xvalues = list(map(lambda x: x + self.real_year, xvalues))
-            yvalues = list(map(lambda y: y, yvalues))
+            xvalues = xvalues + self.real_year
             ax.scatter(xvalues, yvalues, label=label)
             ax.plot(xvalues,yvalues)
             handles, labels = ax.get_legend_handles_labels()
@@ -201,10 +251,7 @@ class FinancialModel:
         ax.set_ylim(bottom=min_y-0.05*y_range, top=max_y+0.05*y_range)
         self.add_status_to_plot(ax)
         self.add_residence_to_plot(ax)
-        if self.real_year is 0:
-            ax.set_xlabel('Years Since Initial Conditions')
-        else:
-            ax.set_xlabel('Year')
+        ax.set_xlabel(xlabel)
         ax.set_ylabel('Dollars')
         ax.grid()
         ax.set_title('Individual Financial Events')
@@ -219,20 +266,12 @@ class FinancialModel:
         #axs.flat[1].remove()      
         ax = axs.flat[1]
         # Second plot shows: Total Income per year, AGI per year, Total Expenses per year
-        combined_gross_income = [0 for _ in years]
-        combined_agi = [0 for _ in years]
-        posttax = [0 for _ in years]
-        combined_expenses = [0 for _ in years]
-        explicit_nw_impact = [0 for _ in years]
-        taxes = TaxTable()
-        for year in years:
-            taxes.set_from_fm(self, year)
-            for fe in self.fevents:
-                combined_gross_income[year] = combined_gross_income[year] + fe.gross_income(year) if fe.gross_income(year) > 0 else combined_gross_income[year]
-                combined_agi[year] = combined_agi[year] + fe.adjusted_gross_income(year) if fe.adjusted_gross_income(year) > 0 else combined_agi[year]
-                combined_expenses[year] = combined_expenses[year] - fe.gross_income(year) if fe.gross_income(year) < 0 else combined_expenses[year]
-                explicit_nw_impact[year] = explicit_nw_impact[year] + fe.explicit_nw_impact(year)
-            posttax[year] = combined_gross_income[year] - taxes.incometax(combined_agi[year])
+        self._prepare_sim_arrays()
+        combined_gross_income = self._gross_year[years]
+        combined_agi = self._agi_year[years]
+        posttax = combined_gross_income - self._tax_year[years]
+        combined_expenses = self._exp_year[years]
+        explicit_nw_impact = self._nwimp_year[years]
         real_years = list(map(lambda x: x + self.real_year, years)) 
         ax.scatter(real_years, combined_gross_income, label='Total Gross Income')
         ax.plot(real_years, combined_gross_income)
@@ -240,16 +279,13 @@ class FinancialModel:
         ax.plot(real_years, combined_agi)
         ax.scatter(real_years, posttax, label='PostTax Income')
         ax.plot(real_years, posttax)
-        ax.scatter(real_years, [agi-exp for agi,exp in zip(combined_agi, combined_expenses)], label='PostTax Minus Expenses')
-        ax.plot(real_years, [agi-exp for agi,exp in zip(combined_agi, combined_expenses)])
-        ax.set_xlim(left=np.min(real_years), right=np.max(real_years))
+        ax.scatter(real_years, combined_agi - combined_expenses, label='PostTax Minus Expenses')
+        ax.plot(real_years, combined_agi - combined_expenses)
+        ax.set_xlim(left=min(real_years), right=max(real_years))
         ax.scatter(real_years, explicit_nw_impact, label='Explicit NW Adjustments')
         ax.plot(real_years, explicit_nw_impact)
         ax.xaxis.set_major_locator(matplotlib.ticker.MaxNLocator(integer=True))
-        if self.real_year is 0:
-            ax.set_xlabel('Years Since Initial Conditions')
-        else:
-            ax.set_xlabel('Year')
+        ax.set_xlabel(xlabel)
         ax.set_ylabel('Dollars')
         ax.grid()
         ax.legend()
@@ -257,130 +293,114 @@ class FinancialModel:
         fig.suptitle(f'Cashflow over time for \'{self.name}\'')
         plt.show(block=block)
 
-    @classmethod
-    def get_simyearhash_old(cls, simkey, year, year_start=0):
-        if simkey is None:
-            return f'Year#{str(year-year_start)}'
-        else:
-            if '#' in str(simkey) or ':' in str(simkey):
-                raise ValueError('Cannot have # or : in simkeys. Try numbers instead')
-            return f'Simkey:{str(simkey)}:Year#{str(year-year_start)}'
-    
-
-    @classmethod
-    def get_simyearhash(cls, simkey=0, year=0, year_start=0):
-        # Presume/require that year-year_start is never greater than 99.
-        # Then we just need to shift the simkey left by 100 to make a 'safe'
-        # collision free hash value.
-        return int(hash(simkey)*100+year-year_start)
-
             # Default nw APR and stdev are taken from S&P actual returns, 1928->2019
     def simonce(self, simkey, nyears=30, initial_nw=None, nw_apr_avg=1.075494565, nw_apr_stdev=0.189442643):
+        if nyears > PARAMS.max_years:
+            raise ValueError(f'nyears must be at most {PARAMS.max_years}')
         sim_summary = {}
-        np.random.seed(simkey * 2**16 + simkey)
         sim_summary['name'] = ('{}+{} @ {}+/-{} for {} yrs'.format(self.name, initial_nw, round(nw_apr_avg,3), round(nw_apr_stdev,3), nyears))
         sim_summary['simkey'] = simkey
-        results = {}
         starting_net_worth = self.initial_nw if initial_nw is None else initial_nw
-        results[FinancialModel.get_simyearhash(simkey, 0)] = {'Net Worth':starting_net_worth, 'Explicit NW Impact': np.sum([fe.explicit_nw_impact(0) for fe in self.fevents])}
-        taxes = TaxTable()
-        for cur_year in np.arange(1, nyears):
-            try:
-                this_year = results[FinancialModel.get_simyearhash(simkey, cur_year)] = {}
-                last_year = results[FinancialModel.get_simyearhash(simkey, cur_year - 1)]
-            except Exception as e:
-                print(f'simkey:{simkey} and cur_year:{cur_year}')
-                raise e
+        nw_aprs = self.draw_nw_aprs([simkey], nyears, nw_apr_avg, nw_apr_stdev)[0]
+        sim_results = simonce_core(*self.get_sim_arrays(), float(starting_net_worth), nw_aprs)
+        return sim_results, sim_summary
+
+    @staticmethod
+    def draw_nw_aprs(simkeys, nyears, nw_apr_avg, nw_apr_stdev):
+        # Every yearly NW growth factor for each simkey, drawn up front as one (len(simkeys), nyears) array.
+        # Year 0 never grows. Each simkey gets its own seeded PCG64 generator so a run is reproducible on its own
+        # without touching numpy's global random state.
+        if nyears > PARAMS.max_years:
+            raise ValueError(f'nyears must be at most {PARAMS.max_years}')
+        nw_aprs = np.ones((len(simkeys), nyears))
+        for run, simkey in enumerate(simkeys):
+            rng = np.random.default_rng(int(simkey) * 2**16 + int(simkey))
             use_laplace_approx = True
             if not use_laplace_approx:
-                nw_apr = max(0,np.random.normal(loc = nw_apr_avg, scale = nw_apr_stdev, size = 1)[0])
+                nw_aprs[run, 1:] = rng.normal(loc = nw_apr_avg, scale = nw_apr_stdev, size = nyears-1)
             else:
                 # Use a Laplace approximation: https://sixfigureinvesting.com/2016/03/modeling-stock-market-returns-with-laplace-distribution-instead-of-normal/
-                nw_apr = max(0, np.random.laplace(loc = nw_apr_avg, scale= nw_apr_stdev/1.4142 * 1.19))
-            net_worth_interest = last_year.get('Net Worth', 0) * (nw_apr - 1.0)
-            this_year['Net Worth'] = last_year['Net Worth'] + net_worth_interest + last_year.get('Net Gain',0) + last_year['Explicit NW Impact']
-            this_year['Gross Income'] = np.sum([max(0, fe.gross_income(cur_year)) for fe in self.fevents])
-            this_year['Adjusted Gross Income'] = np.sum([max(0,fe.adjusted_gross_income(cur_year)) for fe in self.fevents])
-            taxes.set_from_fm(self, cur_year)
-            this_year['Taxes'] = taxes.incometax(this_year['Adjusted Gross Income'])
-            this_year['Posttax Income'] = this_year['Gross Income'] - this_year['Taxes']
-            this_year['Expenses'] = abs(np.sum([min(0,fe.gross_income(cur_year)) for fe in self.fevents]))
-            this_year['Explicit NW Impact'] = np.sum([fe.explicit_nw_impact(cur_year) for fe in self.fevents])
-            this_year['Net Gain'] = this_year['Posttax Income'] - this_year['Expenses']
-        return results, sim_summary
-    
-    def simmany(self, nruns=100, nyears=30, **kwargs):
+                nw_aprs[run, 1:] = rng.laplace(loc = nw_apr_avg, scale= nw_apr_stdev/1.4142 * 1.19, size = nyears-1)
+        return np.maximum(0, nw_aprs)
+
+    def get_sim_arrays(self):
+        # Yearly gross income, AGI, taxes, expenses and explicit NW impact, as taken by simonce_core
+        self._prepare_sim_arrays()
+        return self._gross_year, self._agi_year, self._tax_year, self._exp_year, self._nwimp_year
+
+    def simmany(self, nruns=100, nyears=30, initial_nw=None, nw_apr_avg=1.075494565, nw_apr_stdev=0.189442643):
+        if nyears > PARAMS.max_years:
+            raise ValueError(f'nyears must be at most {PARAMS.max_years}')
         print(f'Starting to simulate {self.name} over {nruns} runs for {nyears} years each...]', flush=True)
         start_time = time.monotonic()
-        master_results = {}
 
         # simkeys = [simnum for simnum in np.arange(1,nruns)]
         simkeys = np.arange(1,nruns)
-        parallel = True
-        if parallel:
-            nproc = multiprocessing.cpu_count()
-            thread_pool = multiprocessing.Pool(nproc)
-
-            simonce_simkeyonly = functools.partial(self.simonce, nyears=nyears, **kwargs)
-            simresults = thread_pool.map(simonce_simkeyonly, simkeys)
+        starting_net_worth = self.initial_nw if initial_nw is None else initial_nw
+        sim_arrays = self.get_sim_arrays()
+        nw_aprs = self.draw_nw_aprs(simkeys, nyears, nw_apr_avg, nw_apr_stdev)
+        if HAVE_NUMBA:
+            # The jitted kernel runs every simkey in parallel threads itself
+            all_runs = simmany_core(*sim_arrays, float(starting_net_worth), nw_aprs)
         else:
-            simresults = [self.simonce(simkey=simkey, nyears=nyears, **kwargs) for simkey in simkeys]
+            # Without numba, step through the years once and update all simkeys together with numpy
+            all_runs = simmany_vectorized(*sim_arrays, float(starting_net_worth), nw_aprs)
         
         print(f'\tFinished simulating {self.name} in ' + '{} seconds...'.format(round(time.monotonic()-start_time,1)))
         start_time = time.monotonic()
-        for results, sim_summary in simresults:
-            master_results.update(results)
+        # (summaries + runs, years, results); see SUMMARY_IDX and FIELD_IDX
+        master_results = np.empty((len(SUMMARY_KEYS) + len(simkeys), nyears, N_RESULTS))
+        master_results[len(SUMMARY_KEYS):] = all_runs
         with warnings.catch_warnings():
             # Numpy warns us that some of these arrays/lists sometimes are pathological (empty, etc)
             # and we really don't care.
             warnings.simplefilter("ignore", category=RuntimeWarning)
-            medianop = lambda values: np.nanmedian([v for v in values if v is not None])
-            meanop = lambda values: np.nanmean([v for v in values if v is not None])
-            stdevop = lambda values: np.nanstd([v for v in values if v is not None])
-            tenpercentop = lambda values: np.nanpercentile([v for v in values if v is not None], 10)
-            ninetypercentop = lambda values: np.nanpercentile([v for v in values if v is not None], 90)
+            # Each summary reduces the (runs, years, results) array across runs in a single call
+            medianop = lambda runs: np.nanmedian(runs, axis=0)
+            meanop = lambda runs: np.nanmean(runs, axis=0)
+            stdevop = lambda runs: np.nanstd(runs, axis=0)
+            tenpercentop = lambda runs: np.nanpercentile(runs, 10, axis=0)
+            ninetypercentop = lambda runs: np.nanpercentile(runs, 90, axis=0)
             Summaries = {'Median': medianop, 'Mean': meanop, 'STDEV': stdevop, '10%':tenpercentop, '90%':ninetypercentop}
-            resultkeys = ['Net Worth', 'Gross Income', 'Adjusted Gross Income', 'Taxes', 'Posttax Income', 'Expenses', 'Net Gain', 'Explicit NW Impact']
-            master_summary = {'name':self.name, 'nruns':nruns, 'real_year': self.real_year, 'nyears':nyears, 'simkeys':simkeys, 'Summaries':Summaries, 'resultkeys':resultkeys}
-            for summary in Summaries:
-                    for year in np.arange(0, nyears):
-                        master_results[self.get_simyearhash(summary, year)] = {}
-                        for result in resultkeys:
-                            result_list = [master_results[self.get_simyearhash(simkey,year)].get(result, float('NaN')) for simkey in simkeys]
-                            master_results[self.get_simyearhash(summary, year)][result] = Summaries[summary](result_list)
+            master_summary = {'name':self.name, 'nruns':nruns, 'real_year': self.real_year, 'nyears':nyears, 'simkeys':simkeys, 'Summaries':Summaries, 'resultkeys':RESULT_KEYS}
+            # The order statistics share one nanpercentile call, so the NaN-aware partition over runs only happens once
+            master_results[[SUMMARY_IDX['Median'], SUMMARY_IDX['10%'], SUMMARY_IDX['90%']]] = np.nanpercentile(all_runs, [50, 10, 90], axis=0)
+            master_results[SUMMARY_IDX['Mean']] = Summaries['Mean'](all_runs)
+            master_results[SUMMARY_IDX['STDEV']] = Summaries['STDEV'](all_runs)
         print(f'\tFinished summarizing {self.name} in ' + '{} seconds'.format(round(time.monotonic()-start_time,1)))
         return master_results, master_summary
 
     def get_plotdata(self, master_tuple, summary='Mean', result='Net Worth'):
         master_results, master_summary = master_tuple
         xvalues = np.arange(1,master_summary['nyears']) 
-        yvalues = [master_results[self.get_simyearhash(summary,year)] for year in xvalues]
+        yvalues = master_results[SUMMARY_IDX[summary], xvalues, FIELD_IDX[result]]
         label = f'{summary} {result}'
         return xvalues, yvalues, label
     
     def plot(self, master_tuple, block=False):
         master_results, master_summary = master_tuple
         results_lists=[['Net Worth'],['Gross Income', 'Taxes', 'Expenses', 'Posttax Income', 'Net Gain', 'Explicit NW Impact']]
-        xvalues = [x for x in np.arange(1,master_summary['nyears'])] 
+        xvalues = range(1, master_summary['nyears'])
         real_years = [x+self.real_year for x in xvalues]
         fig, axs = plt.subplots(len(results_lists),1,figsize=(16,8), constrained_layout=True)
+        xlabel = 'Years Since Initial Conditions' if self.real_year == 0 else 'Year'
         for index, result_list in enumerate(results_lists):
             ax = axs.flat[index]
             max_y_on_axis = -float("inf")
             for result in result_list:
-                yvalues = [master_results[self.get_simyearhash('Mean',year)][result] for year in xvalues]
+                yvalues = master_results[SUMMARY_IDX['Mean'], xvalues, FIELD_IDX[result]]
                 max_y_on_axis = max(max_y_on_axis, np.max(yvalues))
                 label = f'{result}'
                 thisplot = ax.plot(real_years, yvalues, label=label)
                 thisplot_color = thisplot[0].get_color()
-                top_bar = [master_results[self.get_simyearhash('90%',year)][result] for year in xvalues]
-                bottom_bar = [master_results[self.get_simyearhash('10%',year)][result] for year in xvalues]
+                top_bar = master_results[SUMMARY_IDX['90%'], xvalues, FIELD_IDX[result]]
+                bottom_bar = master_results[SUMMARY_IDX['10%'], xvalues, FIELD_IDX[result]]
                 ax.fill_between(real_years, bottom_bar, top_bar, color=thisplot_color, alpha=0.2)
             ax.legend()
-            ax.set_xlim(left=np.min(real_years), right=np.max(real_years))
+            ax.set_xlim(left=min(real_years), right=max(real_years))
             ax.set_ylim(top=max_y_on_axis*1.05)
             ax.xaxis.set_major_locator(matplotlib.ticker.MaxNLocator(integer=True))
-            ax.set_xlabel('Years Since Initial Conditions' if self.real_year is 0 else 'Year')
+            ax.set_xlabel(xlabel)
             ax.set_ylabel('Current Value Dollars')
             ax.set_yticklabels(['${:,}'.format(int(x)) for x in ax.get_yticks().tolist()])
             ax.grid()
@@ -389,37 +409,36 @@ class FinancialModel:
 
     @staticmethod
     def plotmany(master_tuple_list, nyears=float('inf'), block=False, subplot_columns=2):
-        # Does not well handle Financial Models that don't all start on the same real year
+        # Models that start on different real years share one x-axis, each only drawn over the years it simulated
         master_results_list, master_summary_list = zip(*master_tuple_list)
         results_lists=[['Net Worth'],['Gross Income', 'Taxes', 'Posttax Income'], ['Expenses'], ['Net Gain', 'Explicit NW Impact']]
-        min_real_year = np.min([ms['real_year'] for ms in master_summary_list])
-        max_real_year = min(nyears, np.max([ms['real_year']+ms['nyears'] for ms in master_summary_list]))
+        min_real_year = min(ms['real_year'] for ms in master_summary_list)
+        max_real_year = min(nyears, max(ms['real_year']+ms['nyears'] for ms in master_summary_list))
         real_years = np.arange(min_real_year, max_real_year)
         sprows = math.ceil(len(results_lists)/subplot_columns)
         fig, axs = plt.subplots(sprows,subplot_columns,figsize=(16,8), constrained_layout=True)
+        xlabel = 'Years Since Initial Conditions' if real_years[0] == 0 else 'Year'
         for index, result_list in enumerate(results_lists):
             ax = axs.flat[index]
             max_y_on_axis = -float("inf")
             for result in result_list:
                 for master_results, master_summary in master_tuple_list:
-                    ry = master_summary['real_year']
-                    try:
-                        yvalues = [master_results[FinancialModel.get_simyearhash('Mean',year,ry)].get(result, None) for year in real_years]
-                    except KeyError as e:
-                        print('Master Results contains...\n{}'.format(master_results))
-                        raise e
+                    # Years outside this model's simulated range stay NaN, which matplotlib leaves as a gap
+                    offsets = real_years - master_summary['real_year']
+                    in_range = (offsets >= 0) & (offsets < master_summary['nyears'])
+                    summary_rows = [SUMMARY_IDX['Mean'], SUMMARY_IDX['90%'], SUMMARY_IDX['10%']]
+                    yvalues, top_bar, bottom_bar = np.full((len(summary_rows), len(real_years)), np.nan)
+                    yvalues[in_range], top_bar[in_range], bottom_bar[in_range] = master_results[summary_rows][:, offsets[in_range], FIELD_IDX[result]]
                     max_y_on_axis = max(max_y_on_axis, np.nanmax(yvalues))
                     label = f'{master_summary["name"]}:{result}'
                     thisplot = ax.plot(real_years, yvalues, label=label)
                     thisplot_color = thisplot[0].get_color()
-                    top_bar = [master_results[FinancialModel.get_simyearhash('90%',year,ry)].get(result, None) for year in real_years]
-                    bottom_bar = [master_results[FinancialModel.get_simyearhash('10%',year,ry)].get(result, None) for year in real_years]
                     ax.fill_between(real_years, bottom_bar, top_bar, color=thisplot_color, alpha=0.2)
             ax.legend()
             ax.set_xlim(left=np.min(real_years), right=np.max(real_years))
             ax.set_ylim(top=max_y_on_axis*1.05)
             ax.xaxis.set_major_locator(matplotlib.ticker.MaxNLocator(integer=True))
-            ax.set_xlabel('Years Since Initial Conditions' if real_years[0] is 0 else 'Year')
+            ax.set_xlabel(xlabel)
             ax.set_ylabel('Current Value Dollars')
             ax.set_yticklabels(['${:,}'.format(int(x)) for x in ax.get_yticks().tolist()])
             ax.grid()
@@ -0,0 +1,86 @@
+import numpy as np
+
+try:
+    from numba import njit, prange
+    HAVE_NUMBA = True
+except ImportError:
+    # Numba is optional - without it the simulation kernels simply run as regular Python
+    HAVE_NUMBA = False
+    prange = range
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+
+RESULT_KEYS = ['Net Worth', 'Gross Income', 'Adjusted Gross Income', 'Taxes', 'Posttax Income', 'Expenses', 'Net Gain', 'Explicit NW Impact']
+NET_WORTH, GROSS_INCOME, AGI, TAXES, POSTTAX_INCOME, EXPENSES, NET_GAIN, EXPLICIT_NW_IMPACT = range(len(RESULT_KEYS))
+N_RESULTS = len(RESULT_KEYS)
+
+# Explicit signatures make numba compile the kernels when this module is imported, and cache=True keeps that
+# compiled code on disk, so later sessions load it instead of paying the JIT cost on the first simulation.
+# Callers must pass float64 arrays (and a float initial_nw) to match.
+SIMONCE_SIGNATURE = 'float64[:, :](float64[:], float64[:], float64[:], float64[:], float64[:], float64, float64[:])'
+SIMMANY_SIGNATURE = 'float64[:, :, :](float64[:], float64[:], float64[:], float64[:], float64[:], float64, float64[:, :])'
+
+
+@njit(SIMONCE_SIGNATURE, cache=True)
+def simonce_core(gross_year, agi_year, tax_year, exp_year, nwimp_year, initial_nw, nw_aprs):
+    # One Monte Carlo run over the model's per-year totals, using the pre-drawn nw_aprs[year] for growth.
+    # Returns a (nyears, N_RESULTS) array; year 0 only carries the starting Net Worth and Explicit NW Impact, the rest is NaN.
+    nyears = nw_aprs.shape[0]
+    results = np.full((nyears, N_RESULTS), np.nan)
+    results[0, NET_WORTH] = initial_nw
+    results[0, EXPLICIT_NW_IMPACT] = nwimp_year[0]
+    # Last year's values are carried in locals rather than read back out of results
+    net_worth = initial_nw
+    last_net_gain = 0.0
+    last_nw_impact = nwimp_year[0]
+    for cur_year in range(1, nyears):
+        net_worth_interest = net_worth * (nw_aprs[cur_year] - 1.0)
+        net_worth = net_worth + net_worth_interest + last_net_gain + last_nw_impact
+        gross_income = gross_year[cur_year]
+        taxes = tax_year[cur_year]
+        expenses = exp_year[cur_year]
+        last_net_gain = gross_income - taxes - expenses
+        last_nw_impact = nwimp_year[cur_year]
+        results[cur_year, NET_WORTH] = net_worth
+        results[cur_year, GROSS_INCOME] = gross_income
+        results[cur_year, AGI] = agi_year[cur_year]
+        results[cur_year, TAXES] = taxes
+        results[cur_year, POSTTAX_INCOME] = gross_income - taxes
+        results[cur_year, EXPENSES] = expenses
+        results[cur_year, EXPLICIT_NW_IMPACT] = last_nw_impact
+        results[cur_year, NET_GAIN] = last_net_gain
+    return results
+
+
+@njit(SIMMANY_SIGNATURE, cache=True, parallel=True)
+def simmany_core(gross_year, agi_year, tax_year, exp_year, nwimp_year, initial_nw, nw_aprs):
+    # Independent Monte Carlo runs spread across threads, one row of nw_aprs per run. Returns (nruns, nyears, N_RESULTS)
+    all_runs = np.empty((nw_aprs.shape[0], nw_aprs.shape[1], N_RESULTS))
+    for run in prange(nw_aprs.shape[0]):
+        all_runs[run] = simonce_core(gross_year, agi_year, tax_year, exp_year, nwimp_year, initial_nw, nw_aprs[run])
+    return all_runs
+
+
+def simmany_vectorized(gross_year, agi_year, tax_year, exp_year, nwimp_year, initial_nw, nw_aprs):
+    # Pure numpy version of simmany_core for when numba isn't available. Net worth carries from year to year so the
+    # years still loop in Python, but each step updates every run at once. Returns (nruns, nyears, N_RESULTS)
+    nruns, nyears = nw_aprs.shape
+    all_runs = np.full((nruns, nyears, N_RESULTS), np.nan)
+    net_gain = gross_year[:nyears] - tax_year[:nyears] - exp_year[:nyears]
+    all_runs[:, 1:, GROSS_INCOME] = gross_year[1:nyears]
+    all_runs[:, 1:, AGI] = agi_year[1:nyears]
+    all_runs[:, 1:, TAXES] = tax_year[1:nyears]
+    all_runs[:, 1:, POSTTAX_INCOME] = gross_year[1:nyears] - tax_year[1:nyears]
+    all_runs[:, 1:, EXPENSES] = exp_year[1:nyears]
+    all_runs[:, :, EXPLICIT_NW_IMPACT] = nwimp_year[:nyears]
+    all_runs[:, 1:, NET_GAIN] = net_gain[1:]
+    net_worth = all_runs[:, :, NET_WORTH]
+    net_worth[:, 0] = initial_nw
+    for cur_year in range(1, nyears):
+        last_net_gain = net_gain[cur_year-1] if cur_year > 1 else 0.0
+        net_worth_interest = net_worth[:, cur_year-1] * (nw_aprs[:, cur_year] - 1.0)
+        net_worth[:, cur_year] = net_worth[:, cur_year-1] + net_worth_interest + last_net_gain + nwimp_year[cur_year-1]
+    return all_runs
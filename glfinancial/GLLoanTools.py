@@ -1,35 +1,32 @@
-import scipy.optimize
-import numpy as np
-import sys
-
-
 def pay_monthly_on_loan(initial_value, apr, duration_years, monthly_payment):
-    principal = {0:initial_value}
-    for year in np.arange(1,duration_years):
-        principal[year] = principal[year-1] * apr - 12 * monthly_payment
-    return principal[year]
+    return pay_yearly_on_loan(initial_value, apr, duration_years, 12 * monthly_payment)
 
 def find_monthly_payment(loan_value, apr, duration_years):
-    principal_remaining = lambda monthly_payment : pay_monthly_on_loan(loan_value, apr, duration_years, monthly_payment)
-    # Use a Brent gradient approach method of solving roots to determine the proper value
-    payment_needed = scipy.optimize.brentq(principal_remaining, 0, loan_value * (apr**duration_years))
-    return round(payment_needed)
+    return round(yearly_payment_needed(loan_value, apr, duration_years) / 12)
 
 
 def pay_yearly_on_loan(initial_value, apr, duration_years, yearly_payment):
-    principal = {0:initial_value}
-    for year in np.arange(1,duration_years):
-        principal[year] = principal[year-1] * apr - yearly_payment
-    return principal[year]
+    # Closed form of principal[year] = principal[year-1] * apr - yearly_payment
+    # after the duration_years-1 yearly payments
+    periods = max(duration_years - 1, 0)
+    if apr == 1:
+        return initial_value - yearly_payment * periods
+    growth = apr ** periods
+    return initial_value * growth - yearly_payment * (growth - 1) / (apr - 1)
+
+def yearly_payment_needed(loan_value, apr, duration_years):
+    # Solve pay_yearly_on_loan(...) == 0 for the payment directly rather than root-finding
+    periods = max(duration_years - 1, 1)
+    if apr == 1:
+        return loan_value / periods
+    growth = apr ** periods
+    return loan_value * growth * (apr - 1) / (growth - 1)
 
 def find_yearly_payment(loan_value, apr, duration_years):
-    principal_remaining = lambda yearly_payment : pay_yearly_on_loan(loan_value, apr, duration_years, yearly_payment)
-    # Use a Brent gradient approach method of solving roots to determine the proper value
-    payment_needed = scipy.optimize.brentq(principal_remaining, 0, loan_value * (apr**duration_years))
-    return round(payment_needed)
+    return round(yearly_payment_needed(loan_value, apr, duration_years))
 
 
-if __name__ is '__main__':
+if __name__ == '__main__':
 	loan_value = 400 * 1000
 	apr = 1.05
 	monthly_30 = find_monthly_payment(loan_value, apr, 30)
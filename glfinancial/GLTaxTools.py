@@ -1,4 +1,6 @@
-import collections
+import math
+
+import numpy as np
 
 single_filer_tax_rates = [
     (9700, 0.10),
@@ -60,55 +62,109 @@ tax_at_location = {
 federal_tax_rates = {'single': single_filer_tax_rates, 'married':married_filer_tax_rates}
 federal_standard_deductions = {'single':12000, 'married':24000}
 
+def bracket_arrays(tax_rates):
+    # Split a [(end, rate), ...] schedule into numpy arrays of bracket ends, starts and rates, plus the full tax owed
+    # on every bracket below each one. No schedule at all is treated as a single 0% bracket.
+    tax_rates = tax_rates or [(1000 ** 5, 0.0)]
+    ends = np.array([end for end, rate in tax_rates], dtype=np.float64)
+    rates = np.array([rate for end, rate in tax_rates], dtype=np.float64)
+    starts = np.concatenate([[0.0], ends[:-1]])
+    tax_below = np.concatenate([[0.0], np.cumsum((ends - starts) * rates)[:-1]])
+    return ends, starts, rates, tax_below
+
+def bracket_tax(taxable_income, ends, starts, rates, tax_below):
+    # Binary search each income's top bracket, then add the tax on the part of it inside that bracket
+    taxable_income = np.clip(taxable_income, 0, ends[-1])
+    bracket = np.searchsorted(ends, taxable_income)
+    return tax_below[bracket] + (taxable_income - starts[bracket]) * rates[bracket]
+
+def specialize_incometax(standard_deduction, *bracket_schedules):
+    # Generate a scalar incometax with every bracket constant written straight into the code. It follows the same
+    # bracket_tax formula one schedule at a time, so it gives exactly the same answer as the array path.
+    lines = ['def incometax(pretax_income):',
+             f'    taxable_income = pretax_income - {float(standard_deduction)!r}',
+             '    tax_owed = 0.0',
+             '    if taxable_income > 0.0:']
+    for ends, starts, rates, tax_below in bracket_schedules:
+        if not rates.any():
+            continue
+        for bracket, (end, start, rate, below) in enumerate(zip(ends.tolist(), starts.tolist(), rates.tolist(), tax_below.tolist())):
+            lines.append(f'        {"if" if bracket == 0 else "elif"} taxable_income <= {end!r}:')
+            lines.append(f'            tax_owed += {below!r} + (taxable_income - {start!r}) * {rate!r}')
+        lines.append('        else:')
+        lines.append(f'            tax_owed += {below!r} + ({end!r} - {start!r}) * {rate!r}')
+    lines.append('    return float(math.floor(tax_owed + 0.5))')
+    namespace = {'math': math}
+    exec('\n'.join(lines), namespace)
+    return namespace['incometax']
+
 class TaxTable():
     def __init__(self, status='single', state=None):
+        self._set_status(status)
+        self._set_state(state)
+        self._update_lookups()
+
+    def _set_status(self, status):
         if not status in federal_tax_rates.keys():
-            raise ValueError(f'status must be one of {self.federal.keys()}')
+            raise ValueError(f'status must be one of {list(federal_tax_rates.keys())}')
         self.federal = federal_tax_rates[status]
-        self.state = tax_at_location[state.upper()] if state is not None else []
         self.standard_deduction = federal_standard_deductions[status]
+        self._fed_brackets = bracket_arrays(self.federal)
+
+    def _set_state(self, state):
+        self.state = tax_at_location[state.upper()] if state is not None else []
+        self._state_brackets = bracket_arrays(self.state)
 
     def change_status(self, status):
-        if not status in federal_tax_rates.keys():
-            raise ValueError(f'status must be one of {self.federal.keys()}')
-        self.federal = federal_tax_rates[status]
-        self.standard_deduction = federal_standard_deductions[status]
+        self._set_status(status)
+        self._update_lookups()
 
     def change_state(self, state):
-        self.state = tax_at_location[state.upper()] if state is not None else []
+        self._set_state(state)
+        self._update_lookups()
+
+    def _update_lookups(self):
+        # Everything derived from the current schedules, rebuilt whenever status or state changes
+        self._incometax_specialized = specialize_incometax(self.standard_deduction, self._fed_brackets, self._state_brackets)
+        # Posttax income is piecewise linear in pretax income, bending only at the standard deduction and at each
+        # federal or state bracket edge above it. Keep those bend points so pretax can interpolate straight back.
+        bracket_ends = np.union1d(self._fed_brackets[0], self._state_brackets[0])
+        taxable_income = np.concatenate([[0.0], bracket_ends])
+        self._pretax_knots = np.concatenate([[0.0], taxable_income + self.standard_deduction])
+        self._posttax_knots = self._pretax_knots - np.concatenate([[0.0], self._unrounded_tax(taxable_income)])
 
     def set_from_fm(self, financialmodel, year):
-        current_location = financialmodel.residences.get(year, None)
-        current_status = financialmodel.status.get(year, None)
-        self.change_state(current_location)
-        self.change_status(current_status)
+        # Set both before rebuilding, so the lookups are only regenerated once
+        self._set_state(financialmodel.residences[year])
+        self._set_status(financialmodel.status[year])
+        self._update_lookups()
+
+    def _unrounded_tax(self, taxable_income):
+        return bracket_tax(taxable_income, *self._fed_brackets) + bracket_tax(taxable_income, *self._state_brackets)
 
     def incometax(self, pretax_income_arg):
-        if isinstance(pretax_income_arg, collections.Iterable):
-            return [self.incometax(i) for i in pretax_income_arg]
-        tax_owed = 0
-        previous_end = 0
-        pretax_income = pretax_income_arg - self.standard_deduction
-        for end, rate in self.federal:
-            money_in_bracket = max(min(pretax_income - previous_end, end - previous_end), 0)
-            tax_owed = tax_owed + money_in_bracket * rate
-            previous_end = end
-        for end, rate in self.state:
-            money_in_bracket = max(min(pretax_income - previous_end, end - previous_end), 0)
-            tax_owed = tax_owed + money_in_bracket * rate
-            previous_end = end
-        return round(tax_owed, 0)
+        # Whole dollars, rounding halves up. Scalars skip numpy entirely since they come in one at a time.
+        if np.ndim(pretax_income_arg) == 0:
+            if not math.isfinite(pretax_income_arg):
+                raise ValueError('pretax income must be finite')
+            return self._incometax_specialized(pretax_income_arg)
+        pretax_income = np.asarray(pretax_income_arg, dtype=np.float64)
+        if not np.isfinite(pretax_income).all():
+            raise ValueError('pretax income must be finite')
+        return np.floor(self._unrounded_tax(pretax_income - self.standard_deduction) + 0.5)
 
     def posttax(self, pretax_income_arg):
-        if isinstance(pretax_income_arg, collections.Iterable):
-            return [self.posttax(i) for i in pretax_income_arg]
-        return round(pretax_income_arg - self.incometax(pretax_income_arg), 0)
-
-
-    def pretax(self, posttax_income):
-        if isinstance(posttax_income, collections.Iterable):
-            return [self.pretax(i) for i in posttax_income]
-        pretax_error = lambda pretax_income: self.posttax(pretax_income) - posttax_income
-        # Use a Brent gradient approach method of solving roots to determine the proper value
-        pretax_income_result, rootresults = scipy.optimize.brentq(pretax_error, 0, posttax_income * 100, full_output=True)
-        return round(pretax_income_result, 1)
+        if np.ndim(pretax_income_arg) == 0:
+            return float(math.floor(pretax_income_arg - self.incometax(pretax_income_arg) + 0.5))
+        pretax_income = np.asarray(pretax_income_arg, dtype=np.float64)
+        return np.floor(pretax_income - self.incometax(pretax_income) + 0.5)
+
+
+    def pretax(self, posttax_income_arg):
+        # To the nearest dime, rounding halves up
+        if not np.isfinite(posttax_income_arg).all():
+            raise ValueError('posttax income must be finite')
+        pretax_income = np.interp(posttax_income_arg, self._posttax_knots, self._pretax_knots)
+        if np.ndim(posttax_income_arg) == 0:
+            return math.floor(pretax_income * 10 + 0.5) / 10
+        return np.floor(pretax_income * 10 + 0.5) / 10
\ No newline at end of file
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The GL* modules import each other by bare name, so make the package directory importable
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,108 @@
+import warnings
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pytest
+
+import GLFinancial as glf
+
+
+def small_model(name='Test', real_year=0):
+    fm = glf.FinancialModel(name, real_year=real_year, location='CA')
+    fm.add_yearly(100000, 'Salary', year_end=20, agi_impacting=True)
+    fm.add_monthly(-2000, 'Rent')
+    fm.add_loan(200000, 'Mortgage', 15, year_start=2, apr=1.03)
+    return fm
+
+
+def test_loan_schedule():
+    fe = glf.FinancialEvent().define_loan(100000, 'Loan', 15, year_start=3, apr=1.06)
+    payments = fe.cashflow[fe.cashflow != 0]
+    assert np.flatnonzero(fe.cashflow).tolist() == list(range(3, 18))
+    assert (payments[:-1] == -glf.find_yearly_payment(100000, 1.06, 15)).all()
+
+
+@pytest.mark.parametrize('kwargs', [
+    {'duration': 0},
+    {'duration': 1},
+    {'duration': 15, 'early_payoff_year': 3},
+    {'duration': 15, 'early_payoff_year': 1},
+    {'duration': 80},
+    {'duration': 15, 'apr': 1.5},
+])
+def test_define_loan_rejects_unschedulable_loans(kwargs):
+    with pytest.raises(ValueError):
+        glf.FinancialEvent().define_loan(100000, 'Loan', year_start=3, **kwargs)
+
+
+@pytest.mark.parametrize('year_start, year_end', [(-1, 10), (10, 5), (0, 80)])
+def test_define_yearly_rejects_out_of_range_years(year_start, year_end):
+    with pytest.raises(ValueError):
+        glf.FinancialEvent().define_yearly(1000, 'Income', year_start=year_start, year_end=year_end)
+
+
+def test_simulations_reject_too_many_years():
+    fm = small_model()
+    nyears = glf.PARAMS.max_years + 1
+    with pytest.raises(ValueError):
+        fm.simonce(1, nyears=nyears)
+    with pytest.raises(ValueError):
+        fm.simmany(nruns=5, nyears=nyears)
+    with pytest.raises(ValueError):
+        glf.FinancialModel.draw_nw_aprs([1], nyears, 1.07, 0.18)
+
+
+def test_simonce_matches_simmany_run():
+    fm = small_model()
+    master_results, master_summary = fm.simmany(nruns=6, nyears=30)
+    for run, simkey in enumerate(master_summary['simkeys']):
+        sim_results, sim_summary = fm.simonce(simkey, nyears=30)
+        assert np.array_equal(master_results[len(glf.SUMMARY_KEYS) + run], sim_results, equal_nan=True)
+
+
+def test_plotmany_leaves_gaps_outside_simulated_years():
+    early = small_model('Early', real_year=2020).simmany(nruns=6, nyears=10)
+    late = small_model('Late', real_year=2025).simmany(nruns=6, nyears=10)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        glf.FinancialModel.plotmany([early, late])
+    late_line = plt.gcf().axes[0].get_lines()[1]
+    plt.close('all')
+    yvalues = late_line.get_ydata()
+    assert np.isnan(yvalues[:5]).all()
+    assert np.array_equal(yvalues[5:], late[0][glf.SUMMARY_IDX['Mean'], :10, glf.FIELD_IDX['Net Worth']][:len(yvalues) - 5])
+
+
+@pytest.mark.parametrize('year_start, year_end, filled', [
+    (-1, 5, range(0, 5)),
+    (-10, -5, range(0)),
+    (15.0, None, range(15, 75)),
+    (80, None, range(0)),
+])
+def test_change_status_fills_simulated_years(year_start, year_end, filled):
+    fm = small_model()
+    fm.change_status('married', year_start=year_start, year_end=year_end)
+    fm.change_residence('MA', year_start=year_start, year_end=year_end)
+    assert len(fm.status) == len(fm.residences) == glf.PARAMS.max_years
+    assert [year for year, status in enumerate(fm.status) if status == 'married'] == list(filled)
+    assert [year for year, location in enumerate(fm.residences) if location == 'MA'] == list(filled)
+
+
+def test_change_status_rejects_fractional_years():
+    with pytest.raises(ValueError):
+        small_model().change_status('married', year_start=1.5)
+
+
+def test_direct_edits_rebuild_sim_arrays():
+    fm = small_model()
+    before = fm.simonce(1)[0]
+    fm.fevents.append(glf.FinancialEvent().define_yearly(50000, 'Bonus', year_end=20))
+    fm.status[5:] = ['married'] * (glf.PARAMS.max_years - 5)
+    fm.residences[10:] = ['NC'] * (glf.PARAMS.max_years - 10)
+    fresh = small_model()
+    fresh.add_yearly(50000, 'Bonus', year_end=20)
+    fresh.change_status('married', year_start=5)
+    fresh.change_residence('NC', year_start=10)
+    after = fm.simonce(1)[0]
+    assert not np.array_equal(before, after, equal_nan=True)
+    assert np.array_equal(after, fresh.simonce(1)[0], equal_nan=True)
@@ -0,0 +1,30 @@
+import numpy as np
+
+from GLKernels import simonce_core, simmany_core, simmany_vectorized, NET_WORTH, EXPLICIT_NW_IMPACT
+
+
+def yearly_arrays(nyears=40, seed=0):
+    rng = np.random.default_rng(seed)
+    gross = rng.uniform(0, 200000, nyears)
+    agi = gross * 0.9
+    tax = np.rint(agi * 0.2)
+    expenses = rng.uniform(0, 100000, nyears)
+    nwimp = rng.uniform(0, 20000, nyears)
+    return gross, agi, tax, expenses, nwimp
+
+
+def test_simmany_kernels_match_simonce():
+    arrays = yearly_arrays()
+    nw_aprs = np.random.default_rng(1).uniform(0.8, 1.3, (25, 40))
+    nw_aprs[:, 0] = 1.0
+    per_run = np.array([simonce_core(*arrays, 1000.0, run_aprs) for run_aprs in nw_aprs])
+    assert np.array_equal(simmany_core(*arrays, 1000.0, nw_aprs), per_run, equal_nan=True)
+    assert np.array_equal(simmany_vectorized(*arrays, 1000.0, nw_aprs), per_run, equal_nan=True)
+
+
+def test_simonce_year_zero():
+    arrays = yearly_arrays(nyears=5)
+    results = simonce_core(*arrays, 5000.0, np.ones(5))
+    assert results[0, NET_WORTH] == 5000.0
+    assert results[0, EXPLICIT_NW_IMPACT] == arrays[4][0]
+    assert np.isnan(np.delete(results[0], [NET_WORTH, EXPLICIT_NW_IMPACT])).all()
@@ -0,0 +1,28 @@
+import pytest
+
+from GLLoanTools import pay_yearly_on_loan, find_yearly_payment, find_monthly_payment, yearly_payment_needed
+
+
+def iterative_pay_yearly_on_loan(initial_value, apr, duration_years, yearly_payment):
+    # The original year-by-year recurrence the closed form replaced
+    principal = initial_value
+    for year in range(1, duration_years):
+        principal = principal * apr - yearly_payment
+    return principal
+
+
+@pytest.mark.parametrize('apr', [1.0, 1.02, 1.05, 1.1])
+@pytest.mark.parametrize('duration', [2, 3, 15, 30])
+def test_closed_form_matches_iteration(apr, duration):
+    payment = 12345.0
+    expected = iterative_pay_yearly_on_loan(300000, apr, duration, payment)
+    assert pay_yearly_on_loan(300000, apr, duration, payment) == pytest.approx(expected, rel=1e-9, abs=1e-6)
+
+
+@pytest.mark.parametrize('apr', [1.0, 1.03, 1.06])
+@pytest.mark.parametrize('duration', [2, 15, 30])
+def test_payment_pays_off_loan(apr, duration):
+    payment = yearly_payment_needed(300000, apr, duration)
+    assert iterative_pay_yearly_on_loan(300000, apr, duration, payment) == pytest.approx(0, abs=1e-6)
+    assert find_yearly_payment(300000, apr, duration) == round(payment)
+    assert find_monthly_payment(300000, apr, duration) == round(payment / 12)
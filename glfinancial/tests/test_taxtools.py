@@ -0,0 +1,59 @@
+import math
+
+import numpy as np
+import pytest
+
+from GLTaxTools import TaxTable, federal_tax_rates, tax_at_location
+
+INCOMES = np.arange(0, 1500000, 997.0)
+TABLES = [(status, state) for status in federal_tax_rates for state in tax_at_location]
+
+
+@pytest.mark.parametrize('status, state', TABLES)
+def test_scalar_and_array_incometax_agree(status, state):
+    taxes = TaxTable(status, state)
+    array_taxes = taxes.incometax(INCOMES)
+    assert [taxes.incometax(float(income)) for income in INCOMES] == array_taxes.tolist()
+
+
+@pytest.mark.parametrize('status, state', TABLES)
+def test_pretax_inverts_posttax(status, state):
+    taxes = TaxTable(status, state)
+    # posttax rounds to whole dollars, so the round trip is only exact to within that rounding
+    assert np.abs(taxes.pretax(taxes.posttax(INCOMES)) - INCOMES).max() <= 1
+    assert abs(taxes.pretax(taxes.posttax(85000.0)) - 85000.0) <= 1
+
+
+def test_state_brackets_start_from_zero():
+    taxes = TaxTable('single', 'CA')
+    # Exactly fills the first federal (10%) and first CA (1%) brackets
+    assert taxes.incometax(12000 + 8544) == math.floor(8544 * 0.10 + 8544 * 0.01 + 0.5)
+    assert TaxTable('single', 'MA').incometax(112000) - TaxTable('single').incometax(112000) == 5050
+
+
+def test_half_dollars_round_up():
+    # 10% of $5 over the standard deduction is exactly half a dollar
+    taxes = TaxTable('single')
+    assert taxes.incometax(12000 + 5) == 1.0
+    assert taxes.incometax(np.array([12000 + 5.0])).tolist() == [1.0]
+
+
+@pytest.mark.parametrize('bad', [float('nan'), float('inf'), np.array([1.0, np.nan])])
+def test_non_finite_income_rejected(bad):
+    taxes = TaxTable('single', 'CA')
+    with pytest.raises(ValueError):
+        taxes.incometax(bad)
+    with pytest.raises(ValueError):
+        taxes.posttax(bad)
+    with pytest.raises(ValueError):
+        taxes.pretax(bad)
+
+
+def test_set_from_fm_matches_fresh_table():
+    class Model:
+        residences = [None, 'NC']
+        status = ['single', 'married']
+    taxes = TaxTable('single', 'CA')
+    taxes.set_from_fm(Model(), 1)
+    assert taxes.incometax(INCOMES).tolist() == TaxTable('married', 'NC').incometax(INCOMES).tolist()
+    assert taxes.incometax(150000.0) == TaxTable('married', 'NC').incometax(150000.0)